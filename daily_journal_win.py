@@ -1,136 +1,521 @@
 #!/usr/bin/env python3
 import os
 import json
-import requests
 import time
+import queue
+import requests
+from requests.adapters import HTTPAdapter
+from sortedcontainers import SortedList
+import atexit
+import tempfile
+import functools
+import contextlib
 import threading
 from datetime import datetime
 from prompt_toolkit import Application
+from prompt_toolkit.document import Document
 from prompt_toolkit.layout import Layout, HSplit, VSplit, Window, FormattedTextControl
 from prompt_toolkit.key_binding import KeyBindings
 from prompt_toolkit.widgets import TextArea, Frame, Box
 from prompt_toolkit.styles import Style
-from prompt_toolkit.application import get_app
+
+# Use orjson for faster JSON encoding/decoding when available
+try:
+    import orjson
+    json_loads, json_dumps = orjson.loads, orjson.dumps
+    
+    def json_dumps_pretty(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    json_loads = json.loads
+    
+    def json_dumps(obj):
+        # Match orjson, which returns UTF-8 bytes
+        return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+    
+    def json_dumps_pretty(obj):
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+
+# fdatasync skips the metadata flush that fsync forces, but isn't available on Windows
+_datasync = getattr(os, 'fdatasync', os.fsync)
+
+def _atomic_write_json(path, obj):
+    """Write obj as JSON to path so that a crash never leaves a partial file"""
+    fd, tmp_path = tempfile.mkstemp(prefix=f"{os.path.basename(path)}.", suffix='.tmp',
+                                    dir=os.path.dirname(path))
+    try:
+        # mkstemp creates files readable only by the owner
+        os.chmod(tmp_path, 0o644)
+        with open(fd, 'wb') as f:
+            f.write(json_dumps_pretty(obj))
+            f.flush()
+            _datasync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+def _is_newer(entry, other):
+    """Whether entry was updated after other"""
+    if 'updated_at_ns' in entry and 'updated_at_ns' in other:
+        return entry['updated_at_ns'] > other['updated_at_ns']
+    # Entries saved by older versions only carry the ISO timestamp
+    if 'updated_at' in entry and 'updated_at' in other:
+        return datetime.fromisoformat(entry['updated_at']) > datetime.fromisoformat(other['updated_at'])
+    return False
+
+def _is_changes(response_data):
+    """Whether an /entries response holds changes since the last sync rather than all entries"""
+    # Entries are objects, so no entry date maps to an int or list
+    return (isinstance(response_data.get('max_ns'), int)
+            and isinstance(response_data.get('entries'), dict)
+            and isinstance(response_data.get('deleted'), list))
+
+# Seconds to let cache changes accumulate before writing them to disk
+CACHE_FLUSH_DELAY = 5
+
+# Seconds between polls when the server's change stream is unavailable
+SYNC_INTERVAL = 10
+
+# Seconds without any data (the server sends keep-alives) before the stream is considered dead
+STREAM_READ_TIMEOUT = 60
+
+# Number of per-entry locks; must be a power of two
+LOCK_STRIPES = 16
 
 class NetworkJournal:
     def __init__(self, server_url="http://localhost:5000"):
         self.entries = {}
+        # Entry dates kept in order so the UI never has to re-sort them
+        self._sorted_keys = SortedList()
         self.server_url = server_url
         self.data_dir = "data"
+        
+        # Keep connections to the server alive across requests
+        self.http = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+        self.http.mount('http://', adapter)
+        self.http.mount('https://', adapter)
+        self.http.headers.update({'Connection': 'keep-alive'})
+        
+        # ETag of the last server state seen, and whether the server can push changes
+        self._etag = None
+        self._stream_available = True
+        # Server change timestamp up to which all changes have been fetched
+        self._last_sync_ns = 0
+        
+        # Set by close() to stop the background threads
+        self._shutdown = threading.Event()
+        
         self.ensure_data_directory()
-        self.sync_lock = threading.Lock()
+        
+        # Single-key reads and writes of self.entries and self._pending are atomic in
+        # CPython. Changes to one entry are serialized by its stripe lock, so unrelated
+        # entries don't contend; _entries_lock guards _sorted_keys and whole-journal swaps.
+        # Lock order: stripe, then _entries_lock, then _cache_cv
+        self._stripes = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        self._entries_lock = threading.Lock()
+        
+        # Dates whose cache file no longer matches self.entries, and whether
+        # the outbox file no longer matches self._pending
+        self._dirty = set()
+        self._outbox_dirty = False
+        self._cache_cv = threading.Condition()
+        
+        # Set whenever entries are added, changed or removed
+        self.entries_changed = threading.Event()
+        
+        # Changes not yet sent to the server: date_str -> (method, content, body).
+        # The queue holds each pending date once, so only the latest change is sent
+        self._pending = {}
+        self._outbox = queue.SimpleQueue()
+        # Unsent changes are kept next to the cache so they survive restarts
+        # (no .json extension, so it's never loaded as an entry)
+        self.outbox_path = os.path.join(self.data_dir, "outbox")
+        
+        # Start from the local cache, so loading from the server only rewrites the
+        # cache files of entries that differ
+        self.load_local_cache()
+        self.load_outbox()
         self.load_entries()
         
         # Start background sync thread
         self.sync_thread = threading.Thread(target=self.background_sync, daemon=True)
         self.sync_thread.start()
+        
+        # Start thread sending local changes to the server
+        self.outbox_thread = threading.Thread(target=self._outbox_worker, daemon=True)
+        self.outbox_thread.start()
+        
+        # Start local cache flusher thread, and flush pending writes on exit
+        self.cache_thread = threading.Thread(target=self._cache_flusher, daemon=True)
+        self.cache_thread.start()
+        atexit.register(self._flush_dirty_now)
 
     def ensure_data_directory(self):
         """Create data directory if it doesn't exist"""
         if not os.path.exists(self.data_dir):
             os.makedirs(self.data_dir)
 
+    def _lock_for(self, date_str):
+        """Lock serializing changes to one entry"""
+        return self._stripes[hash(date_str) & (LOCK_STRIPES - 1)]
+
+    @contextlib.contextmanager
+    def _all_locked(self):
+        """Hold every lock, for replacing the whole journal"""
+        with contextlib.ExitStack() as stack:
+            for lock in self._stripes:
+                stack.enter_context(lock)
+            with self._entries_lock:
+                yield
+
+    def load_local_cache(self):
+        """Load all journal entries from the local cache"""
+        entries = {}
+        if os.path.exists(self.data_dir):
+            with os.scandir(self.data_dir) as it:
+                for de in it:
+                    if de.name.endswith('.json'):
+                        date_str = de.name[:-5]  # Remove .json extension
+                        try:
+                            with open(de.path, 'rb') as f:
+                                entries[date_str] = json_loads(f.read())
+                        except Exception as e:
+                            print(f"Error loading {de.path}: {e}")
+        with self._all_locked():
+            self.entries = entries
+            self._sorted_keys = SortedList(entries)
+        self.entries_changed.set()
+
+    def load_outbox(self):
+        """Queue the changes left unsent when the client last closed"""
+        if not os.path.exists(self.outbox_path):
+            return
+        try:
+            with open(self.outbox_path, 'rb') as f:
+                changes = json_loads(f.read())
+        except Exception as e:
+            print(f"Error loading {self.outbox_path}: {e}")
+            return
+        for date_str, (method, content) in changes.items():
+            with self._lock_for(date_str):
+                self._queue_change(date_str, method, content)
+
     def load_entries(self):
-        """Load all journal entries from server or local cache"""
+        """Load all journal entries from server, keeping the current ones if it's unavailable"""
         try:
-            # Try to fetch from server
-            response = requests.get(f"{self.server_url}/entries", timeout=2)
-            if response.status_code == 200:
-                self.entries = response.json()
-                # Update local cache
-                self.update_local_cache()
-                return
-        except requests.RequestException:
+            # Try to fetch from server, unless nothing changed since the last sync
+            headers = {'If-None-Match': self._etag} if self._etag else {}
+            response = self.http.get(f"{self.server_url}/entries", headers=headers, timeout=2)
+            if response.status_code == 304:
+                self._last_sync_ns = int(response.headers.get('X-Max-Ns', self._last_sync_ns))
+            elif response.status_code == 200:
+                self.replace_entries(json_loads(response.content), response)
+        except (requests.RequestException, ValueError):
+            # Work offline with the entries loaded already; the local cache holds nothing newer
             pass
+
+    def replace_entries(self, server_entries, response):
+        """Replace the journal with all entries from the server, keeping unsent local changes"""
+        # Servers without delta sync send no timestamp, so they're always asked for everything
+        max_ns = int(response.headers.get('X-Max-Ns', 0))
+        # Local entries missing on the server are only dropped if it deleted them
+        deleted = {date_str for date_str in list(self.entries)
+                   if date_str not in server_entries and date_str not in self._pending
+                   and self._deleted_on_server(date_str)}
+        with self._all_locked():
+            # Keep local changes the server hasn't received yet
+            for date_str, (method, content, body) in self._pending.items():
+                if method == 'POST':
+                    server_entries[date_str] = content
+                else:
+                    server_entries.pop(date_str, None)
+            for date_str, content in self.entries.items():
+                if date_str not in server_entries and date_str not in deleted:
+                    # The server doesn't know this entry (e.g. it was reset), so send it again
+                    server_entries[date_str] = content
+                    self._queue_change(date_str, 'POST', content)
+            # Only rewrite cache files for entries that actually changed, and
+            # remove those of entries deleted on the server meanwhile
+            changed = [date_str for date_str, content in server_entries.items()
+                       if self.entries.get(date_str) != content]
+            changed.extend(date_str for date_str in self.entries if date_str not in server_entries)
+            self.entries = server_entries
+            self._sorted_keys = SortedList(server_entries)
+            self._etag = response.headers.get('ETag')
+            self._last_sync_ns = max_ns
+        for date_str in changed:
+            self._mark_dirty(date_str)
+        if changed:
+            self.entries_changed.set()
+
+    def _deleted_on_server(self, date_str):
+        """Whether the server reports an entry as deleted"""
+        # Raises if the server can't be reached, so nothing is dropped or sent by mistake
+        response = self.http.get(f"{self.server_url}/entries/{date_str}", timeout=2)
+        return response.status_code == 410
+
+    def iter_keys_desc(self):
+        """Iterate over entry dates, newest first"""
+        with self._entries_lock:
+            # Snapshot so other threads can keep modifying the journal
+            keys = list(reversed(self._sorted_keys))
+        return iter(keys)
+
+    def index_desc(self, date_str):
+        """Position of an entry date in newest-first order"""
+        with self._entries_lock:
+            return len(self._sorted_keys) - 1 - self._sorted_keys.index(date_str)
+
+    def _mark_dirty(self, date_str):
+        """Schedule the cache file of an entry to be rewritten"""
+        with self._cache_cv:
+            self._dirty.add(date_str)
+            self._cache_cv.notify()
+
+    def _mark_outbox_dirty(self):
+        """Schedule the outbox file to be rewritten"""
+        with self._cache_cv:
+            self._outbox_dirty = True
+            self._cache_cv.notify()
+
+    def _cache_flusher(self):
+        """Background thread for writing dirty entries to the local cache"""
+        while True:
+            with self._cache_cv:
+                while not self._dirty and not self._outbox_dirty and not self._shutdown.is_set():
+                    self._cache_cv.wait()
             
-        # If server fetch fails, load from local cache
-        self.entries = {}
-        if os.path.exists(self.data_dir):
-            for filename in os.listdir(self.data_dir):
-                if filename.endswith('.json'):
-                    date_str = filename[:-5]  # Remove .json extension
-                    file_path = os.path.join(self.data_dir, filename)
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            self.entries[date_str] = json.load(f)
-                    except Exception as e:
-                        print(f"Error loading {file_path}: {e}")
+            # Debounce so a burst of changes results in a single write per file
+            # (close() flushes whatever is left)
+            if self._shutdown.wait(CACHE_FLUSH_DELAY):
+                return
+            self.update_local_cache()
+
+    def _flush_dirty_now(self):
+        """Write pending cache changes immediately (used on exit)"""
+        self.update_local_cache()
 
     def update_local_cache(self):
-        """Update local cache with current entries"""
-        for date_str, content in self.entries.items():
+        """Update local cache with entries changed since the last flush"""
+        with self._cache_cv:
+            dirty, self._dirty = self._dirty, set()
+            outbox_dirty, self._outbox_dirty = self._outbox_dirty, False
+        
+        if outbox_dirty:
+            self.update_outbox_file()
+        
+        for date_str in dirty:
+            # Copy, the UI may modify the entry while it's being serialized
+            content = self.entries.get(date_str)
+            if content is not None:
+                content = dict(content)
             file_path = os.path.join(self.data_dir, f"{date_str}.json")
             try:
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump(content, f, ensure_ascii=False, indent=2)
+                if content is None:
+                    # Entry was deleted
+                    if os.path.exists(file_path):
+                        os.remove(file_path)
+                    continue
+                
+                _atomic_write_json(file_path, content)
             except Exception as e:
                 print(f"Error caching {file_path}: {e}")
 
-    def save_entry(self, date_str, content):
-        """Save a journal entry to server and local cache"""
-        with self.sync_lock:
-            self.entries[date_str] = content
+    def update_outbox_file(self):
+        """Write the changes not yet sent to the server to the outbox file"""
+        # Snapshot, other threads keep queueing and sending changes
+        changes = {date_str: (method, content) for date_str, (method, content, body)
+                   in list(self._pending.items())}
+        try:
+            if changes:
+                _atomic_write_json(self.outbox_path, changes)
+            elif os.path.exists(self.outbox_path):
+                os.remove(self.outbox_path)
+        except Exception as e:
+            print(f"Error caching {self.outbox_path}: {e}")
+
+    def _queue_change(self, date_str, method, content=None):
+        """Queue a change for the server, replacing any unsent one (hold the entry's stripe lock)"""
+        # Serialize now, the caller may keep modifying content
+        body = json_dumps(content) if content is not None else None
+        if date_str not in self._pending:
+            self._outbox.put(date_str)
+        self._pending[date_str] = (method, content, body)
+        self._mark_outbox_dirty()
+
+    def _outbox_worker(self):
+        """Background thread for sending queued changes to the server"""
+        while True:
+            date_str = self._outbox.get()
+            if date_str is None:
+                # Queued by close() after all pending changes
+                return
+            change = self._pending[date_str]
+            method, content, body = change
             
-            # Try to save to server
+            url = f"{self.server_url}/entries/{date_str}"
             try:
-                response = requests.post(
-                    f"{self.server_url}/entries/{date_str}", 
-                    json=content,
-                    timeout=2
-                )
+                if method == 'POST':
+                    response = self.http.post(
+                        url,
+                        data=body,
+                        headers={'Content-Type': 'application/json'},
+                        timeout=2
+                    )
+                else:
+                    response = self.http.delete(url, timeout=2)
+                # A missing entry on delete is fine, server errors are retried
+                sent = response.status_code < 500
             except requests.RequestException:
-                pass
+                sent = False
             
-            # Always save to local cache
-            file_path = os.path.join(self.data_dir, f"{date_str}.json")
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(content, f, ensure_ascii=False, indent=2)
+            with self._lock_for(date_str):
+                if sent and self._pending.get(date_str) is change:
+                    del self._pending[date_str]
+                else:
+                    # Failed, or replaced by a newer change while sending
+                    self._outbox.put(date_str)
+            if sent:
+                self._mark_outbox_dirty()
+            
+            if not sent:
+                # Server unavailable, retry later
+                if self._shutdown.wait(SYNC_INTERVAL):
+                    return
+
+    def save_entry(self, date_str, content):
+        """Save a journal entry to local cache and queue it for the server"""
+        with self._lock_for(date_str):
+            if date_str not in self.entries:
+                with self._entries_lock:
+                    self._sorted_keys.add(date_str)
+            self.entries[date_str] = content
+            self._queue_change(date_str, 'POST', content)
+        
+        # Always save to local cache
+        self._mark_dirty(date_str)
+        self.entries_changed.set()
 
     def delete_entry(self, date_str):
-        """Delete a journal entry from server and local cache"""
-        with self.sync_lock:
+        """Delete a journal entry from local cache and queue the delete for the server"""
+        with self._lock_for(date_str):
             if date_str in self.entries:
                 del self.entries[date_str]
-            
-            # Try to delete from server
-            try:
-                requests.delete(f"{self.server_url}/entries/{date_str}", timeout=2)
-            except requests.RequestException:
-                pass
-            
-            # Delete from local cache
-            file_path = os.path.join(self.data_dir, f"{date_str}.json")
-            if os.path.exists(file_path):
-                os.remove(file_path)
+                with self._entries_lock:
+                    self._sorted_keys.remove(date_str)
+            self._queue_change(date_str, 'DELETE')
+        
+        # Delete from local cache
+        self._mark_dirty(date_str)
+        self.entries_changed.set()
+
+    def close(self):
+        """Stop the background threads and write pending changes to disk"""
+        self._shutdown.set()
+        with self._cache_cv:
+            self._cache_cv.notify()
+        self._outbox.put(None)
+        
+        # The sync thread may be blocked reading the change stream; it stops at the
+        # next keep-alive, and being a daemon it never delays exiting
+        for thread in (self.outbox_thread, self.cache_thread):
+            thread.join(timeout=2)
+        self.update_local_cache()
+        self.http.close()
 
     def background_sync(self):
         """Background thread for syncing with server"""
-        while True:
+        while not self._shutdown.is_set():
             try:
-                # Sleep to avoid constant polling
-                time.sleep(10)
-                
-                # Get entries from server
-                response = requests.get(f"{self.server_url}/entries", timeout=2)
-                if response.status_code == 200:
-                    with self.sync_lock:
-                        server_entries = response.json()
-                        
-                        # Update local entries with server entries
-                        for date_str, content in server_entries.items():
-                            if date_str not in self.entries:
-                                self.entries[date_str] = content
-                            elif 'updated_at' in content and 'updated_at' in self.entries[date_str]:
-                                # Compare timestamps to see which is newer
-                                server_time = datetime.fromisoformat(content['updated_at'])
-                                local_time = datetime.fromisoformat(self.entries[date_str]['updated_at'])
-                                if server_time > local_time:
-                                    self.entries[date_str] = content
-                        
-                        # Update local cache
-                        self.update_local_cache()
+                if self._stream_available:
+                    # Block until the server pushes changes or the stream drops
+                    self.follow_change_stream()
             except Exception:
                 pass
+            
+            # Stream unavailable, fall back to polling
+            if self._shutdown.wait(SYNC_INTERVAL):
+                return
+            try:
+                self.sync_with_server()
+            except Exception:
+                pass
+
+    def follow_change_stream(self):
+        """Sync whenever the server announces a change, until the stream ends"""
+        with self.http.get(
+            f"{self.server_url}/entries/stream",
+            stream=True,
+            timeout=(2, STREAM_READ_TIMEOUT)
+        ) as response:
+            if response.status_code != 200:
+                if response.status_code == 404:
+                    # Server without push support
+                    self._stream_available = False
+                # Otherwise the server is busy (503), poll and try again later
+                return
+            
+            for line in response.iter_lines(chunk_size=None, decode_unicode=True):
+                if self._shutdown.is_set():
+                    return
+                # Each event carries the server's current ETag
+                if line.startswith('data:') and line[5:].strip() != self._etag:
+                    self.sync_with_server()
+
+    def sync_with_server(self):
+        """Merge entries changed on the server since the last sync into the local journal"""
+        response = self.http.get(
+            f"{self.server_url}/entries",
+            params={'since': self._last_sync_ns},
+            timeout=2
+        )
+        if response.status_code == 200:
+            changes = json_loads(response.content)
+            if not _is_changes(changes):
+                # All entries, from a server without delta sync or after a long time offline
+                self.replace_entries(changes, response)
+                return
+            
+            # Update local entries with server entries, locking only the ones that change
+            changed = []
+            for date_str, content in changes['entries'].items():
+                local = self.entries.get(date_str)
+                if local is not None and not _is_newer(content, local):
+                    continue
+                with self._lock_for(date_str):
+                    if date_str in self._pending:
+                        # Local change still on its way to the server
+                        continue
+                    # Check again, the entry may have been saved meanwhile
+                    local = self.entries.get(date_str)
+                    if local is None:
+                        with self._entries_lock:
+                            self._sorted_keys.add(date_str)
+                    elif not _is_newer(content, local):
+                        continue
+                    self.entries[date_str] = content
+                changed.append(date_str)
+            
+            # Remove entries deleted on the server
+            for date_str in changes['deleted']:
+                with self._lock_for(date_str):
+                    if date_str in self._pending or date_str not in self.entries:
+                        continue
+                    del self.entries[date_str]
+                    with self._entries_lock:
+                        self._sorted_keys.remove(date_str)
+                changed.append(date_str)
+            
+            self._etag = response.headers.get('ETag')
+            self._last_sync_ns = changes['max_ns']
+            
+            # Update local cache
+            for date_str in changed:
+                self._mark_dirty(date_str)
+            if changed:
+                self.entries_changed.set()
 
 class JournalUI:
     def __init__(self, server_url="http://localhost:5000"):
@@ -140,11 +525,24 @@ class JournalUI:
         self.kb = KeyBindings()
         
         # Initialize UI state
-        self.entries_list = sorted(self.journal.entries.keys(), reverse=True)
+        self.entries_list = list(self.journal.iter_keys_desc())
         self.selected_index = 0
         self.edit_mode = False
         self.status_message = "Welcome to Daily Journal (Network Sync Enabled)"
         
+        # Set by close() to stop the refresh thread
+        self._shutdown = threading.Event()
+        
+        # Formatted entries list, rebuilt only when the list or selection changes.
+        # entries_list is always replaced rather than modified, so identity tells if it changed
+        self._entries_text_list = None
+        self._entries_text_index = None
+        self._entries_lines = []
+        self._entries_text_cache = None
+        
+        # Content of recently viewed entries, keyed on the date and update timestamp
+        self._entry_content = functools.lru_cache(maxsize=32)(self._read_entry_content)
+        
         # Create UI components
         self.entries_control = FormattedTextControl(self.get_entries_text)
         self.entries_window = Window(content=self.entries_control)
@@ -191,10 +589,6 @@ class JournalUI:
             'selected': 'reverse',
         })
         
-        # Start refresh thread
-        self.refresh_thread = threading.Thread(target=self.refresh_entries_list, daemon=True)
-        self.refresh_thread.start()
-        
         # Create application
         self.app = Application(
             layout=Layout(self.container),
@@ -204,28 +598,31 @@ class JournalUI:
             style=self.style,
         )
         
+        # Start refresh thread
+        self.refresh_thread = threading.Thread(target=self.watch_entries, daemon=True)
+        self.refresh_thread.start()
+        
         # Load first entry if available
         if self.entries_list:
             self.load_current_entry()
         else:
             self.status_message = "No entries available. Press 'n' to create a new entry."
     
-    def refresh_entries_list(self):
-        """Background thread to refresh entries list periodically"""
+    def watch_entries(self):
+        """Background thread to refresh entries list whenever the journal changes"""
         while True:
-            time.sleep(5)  # Check every 5 seconds
-            
-            # Get latest entries
-            old_entries = set(self.entries_list)
-            new_entries = set(sorted(self.journal.entries.keys(), reverse=True))
+            self.journal.entries_changed.wait()
+            if self._shutdown.is_set():
+                return
+            self.journal.entries_changed.clear()
             
             # If there are changes, update UI
-            if old_entries != new_entries:
-                self.entries_list = sorted(self.journal.entries.keys(), reverse=True)
+            new_entries = list(self.journal.iter_keys_desc())
+            if new_entries != self.entries_list:
+                self.entries_list = new_entries
                 
-                # Notify UI thread to refresh
-                if get_app().is_running:
-                    get_app().invalidate()
+                # Notify UI thread to refresh (safe to call from other threads)
+                self.app.invalidate()
     
     def setup_keybindings(self):
         @self.kb.add('q')
@@ -272,7 +669,7 @@ class JournalUI:
         """Manually refresh entries from server"""
         self.status_message = "Syncing with server..."
         self.journal.load_entries()
-        self.entries_list = sorted(self.journal.entries.keys(), reverse=True)
+        self.entries_list = list(self.journal.iter_keys_desc())
         self.status_message = "Sync completed"
         
         # Reload current entry if it still exists
@@ -281,17 +678,23 @@ class JournalUI:
     
     def get_entries_text(self):
         """Generate formatted text for entries list"""
-        result = []
-        for i, date_str in enumerate(self.entries_list):
-            if i == self.selected_index:
-                result.append(("class:selected", f" {date_str} \n"))
-            else:
-                result.append(("", f" {date_str} \n"))
+        entries_list = self.entries_list
+        if entries_list is not self._entries_text_list:
+            # Format each line once per list
+            self._entries_lines = [("", f" {date_str} \n") for date_str in entries_list]
+            if not entries_list:
+                self._entries_lines.append(("", " No entries available. \n"))
+            self._entries_text_list = entries_list
+            self._entries_text_cache = None
         
-        if not self.entries_list:
-            result.append(("", " No entries available. \n"))
+        if self._entries_text_cache is None or self._entries_text_index != self.selected_index:
+            result = list(self._entries_lines)
+            if 0 <= self.selected_index < len(entries_list):
+                result[self.selected_index] = ("class:selected", result[self.selected_index][1])
+            self._entries_text_cache = result
+            self._entries_text_index = self.selected_index
         
-        return result
+        return self._entries_text_cache
     
     def move_selection_up(self):
         """Move selection up in entries list"""
@@ -305,12 +708,29 @@ class JournalUI:
             self.selected_index += 1
             self.load_current_entry()
     
+    def set_content_text(self, text):
+        """Show text in the content area, skipping the redraw if it's already shown"""
+        if text != self.content_area.buffer.text:
+            self.content_area.buffer.set_document(Document(text, 0), bypass_readonly=True)
+    
+    def entry_content(self, date_str):
+        """Get the content of an entry, cached for recently viewed entries"""
+        entry = self.journal.entries[date_str]
+        updated_at = entry.get('updated_at_ns', entry.get('updated_at'))
+        if updated_at is None:
+            # Without a timestamp updates can't be told apart, so don't cache
+            return entry.get('content', '')
+        # Any update changes the timestamp, so stale content is never returned
+        return self._entry_content(date_str, updated_at)
+    
+    def _read_entry_content(self, date_str, updated_at):
+        return self.journal.entries[date_str].get('content', '')
+    
     def load_current_entry(self):
         """Load the currently selected entry"""
         if self.entries_list and 0 <= self.selected_index < len(self.entries_list):
             date_str = self.entries_list[self.selected_index]
-            content = self.journal.entries[date_str].get('content', '')
-            self.content_area.text = content
+            self.set_content_text(self.entry_content(date_str))
             self.content_area.read_only = True
             self.edit_mode = False
             self.status_message = f"Viewing entry from {date_str} | e:Edit | d:Delete | n:New | r:Refresh | q:Quit"
@@ -328,11 +748,19 @@ class JournalUI:
             counter += 1
         
         # Create empty entry
-        self.journal.save_entry(date_str, {'content': '', 'created_at': datetime.now().isoformat(), 'updated_at': datetime.now().isoformat()})
+        # ISO timestamps are for display, updated_at_ns is compared when syncing
+        now_ns = time.time_ns()
+        now_iso = datetime.fromtimestamp(now_ns / 1e9).isoformat(timespec='seconds')
+        self.journal.save_entry(date_str, {
+            'content': '',
+            'created_at': now_iso,
+            'updated_at': now_iso,
+            'updated_at_ns': now_ns,
+        })
         
         # Update UI
-        self.entries_list = sorted(self.journal.entries.keys(), reverse=True)
-        self.selected_index = self.entries_list.index(date_str)
+        self.entries_list = list(self.journal.iter_keys_desc())
+        self.selected_index = self.journal.index_desc(date_str)
         
         # Enter edit mode
         self.edit_current_entry()
@@ -341,9 +769,8 @@ class JournalUI:
         """Edit the current entry"""
         if self.entries_list and 0 <= self.selected_index < len(self.entries_list):
             date_str = self.entries_list[self.selected_index]
-            content = self.journal.entries[date_str].get('content', '')
             
-            self.content_area.text = content
+            self.set_content_text(self.entry_content(date_str))
             self.content_area.read_only = False
             self.edit_mode = True
             self.status_message = "Editing entry | Enter:Save | Esc:Cancel"
@@ -352,11 +779,17 @@ class JournalUI:
         """Save the current entry"""
         if self.entries_list and 0 <= self.selected_index < len(self.entries_list):
             date_str = self.entries_list[self.selected_index]
-            entry_data = self.journal.entries.get(date_str, {})
-            entry_data['content'] = self.content_area.text
-            entry_data['updated_at'] = datetime.now().isoformat()
+            text = self.content_area.text
             
-            self.journal.save_entry(date_str, entry_data)
+            # Nothing to send or write if the text wasn't changed
+            if date_str not in self.journal.entries or text != self.entry_content(date_str):
+                entry_data = self.journal.entries.get(date_str, {})
+                entry_data['content'] = text
+                now_ns = time.time_ns()
+                entry_data['updated_at'] = datetime.fromtimestamp(now_ns / 1e9).isoformat(timespec='seconds')
+                entry_data['updated_at_ns'] = now_ns
+                
+                self.journal.save_entry(date_str, entry_data)
             self.content_area.read_only = True
             self.edit_mode = False
             self.status_message = f"Entry saved | e:Edit | d:Delete | n:New | r:Refresh | q:Quit"
@@ -373,18 +806,29 @@ class JournalUI:
             self.journal.delete_entry(date_str)
             
             # Update UI
-            self.entries_list = sorted(self.journal.entries.keys(), reverse=True)
+            self.entries_list = list(self.journal.iter_keys_desc())
             if self.entries_list:
                 self.selected_index = min(self.selected_index, len(self.entries_list) - 1)
                 self.load_current_entry()
             else:
                 self.selected_index = 0
-                self.content_area.text = ""
+                self.set_content_text("")
                 self.status_message = "No entries available. Press 'n' to create a new entry."
     
+    def close(self):
+        """Stop the refresh thread and shut down the journal"""
+        self._shutdown.set()
+        self.journal.entries_changed.set()
+        self.refresh_thread.join(timeout=2)
+        self.journal.close()
+    
     def run(self):
         """Run the application"""
-        self.app.run()
+        try:
+            self.app.run()
+        finally:
+            # Runs once the application has exited
+            self.close()
 
 def main():
     # Default to localhost, can be changed via command line
@@ -1,72 +1,382 @@
 #!/usr/bin/env python3
 import os
+import gzip
 import json
+import time
+import socket
+import sqlite3
+import hashlib
+import threading
 import flask
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request
 from datetime import datetime
 
+# Use orjson for faster JSON encoding/decoding when available
+try:
+    import orjson
+    json_loads, json_dumps = orjson.loads, orjson.dumps
+except ImportError:
+    json_loads = json.loads
+    
+    def json_dumps(obj):
+        # Match orjson, which returns UTF-8 bytes
+        return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+# Compress responses when flask-compress is installed
+try:
+    from flask_compress import Compress
+except ImportError:
+    Compress = None
+
 app = Flask(__name__)
 
-# Data directory
+# Data directory and the database holding all entries
 DATA_DIR = "data"
+DB_PATH = os.path.join(DATA_DIR, "journal.db")
+
+# Entry fields stored in the database, in column order after date_str
+ENTRY_FIELDS = ('content', 'created_at', 'updated_at', 'updated_at_ns')
+ENTRY_COLUMNS = ', '.join(('date_str',) + ENTRY_FIELDS)
+
+# Server-side change timestamp for a write: the current time, but always after
+# every earlier change, even ones made by other worker processes or under clock skew.
+# Clients pass the latest one they've seen as ?since= to fetch only newer changes
+NEXT_CHANGE_NS = '''MAX(?,
+    (SELECT IFNULL(MAX(changed_ns), 0) + 1 FROM entries),
+    (SELECT IFNULL(MAX(deleted_ns), 0) + 1 FROM deleted))'''
+
+# Nanoseconds deleted entries are remembered for; clients that last synced
+# longer ago than that get all entries again instead of only the changes
+TOMBSTONE_TTL_NS = 30 * 24 * 3600 * 10**9
+
+# Responses smaller than this many bytes are sent uncompressed
+COMPRESS_MIN_SIZE = 1024
+
+app.config.update(
+    COMPRESS_ALGORITHM=['zstd', 'gzip'],
+    COMPRESS_MIN_SIZE=COMPRESS_MIN_SIZE,
+)
+if Compress is not None:
+    Compress(app)
+
+# Seconds between keep-alive messages on idle change streams
+STREAM_HEARTBEAT = 15
+
+# Address the server listens on
+HOST = '0.0.0.0'
+PORT = 5000
+
+# Worker threads for the production server; every connected client holds one for its change stream
+SERVER_THREADS = int(os.environ.get('NETHER_THREADS', 8))
+
+# Worker threads kept free of change streams, so saves and syncs never wait behind them
+RESERVED_THREADS = 2
+
+# Worker processes for the production server, each with its own listening socket
+SERVER_WORKERS = int(os.environ.get('NETHER_WORKERS', 1))
 
 # Ensure data directory exists
 if not os.path.exists(DATA_DIR):
     os.makedirs(DATA_DIR)
 
-@app.route('/entries', methods=['GET'])
-def get_entries():
-    """Get all journal entries"""
+# Shared by all request threads, guarded by _lock
+_db = sqlite3.connect(DB_PATH, check_same_thread=False)
+_db.executescript('''
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    CREATE TABLE IF NOT EXISTS entries(
+        date_str TEXT PRIMARY KEY,
+        content TEXT,
+        created_at TEXT,
+        updated_at TEXT,
+        updated_at_ns INTEGER,
+        changed_ns INTEGER NOT NULL DEFAULT 0
+    );
+    CREATE TABLE IF NOT EXISTS deleted(
+        date_str TEXT PRIMARY KEY,
+        deleted_ns INTEGER NOT NULL
+    );
+''')
+# Databases created before delta sync lack the change timestamp
+if 'changed_ns' not in {row[1] for row in _db.execute('PRAGMA table_info(entries)')}:
+    _db.execute('ALTER TABLE entries ADD COLUMN changed_ns INTEGER NOT NULL DEFAULT 0')
+_db.executescript('''
+    CREATE INDEX IF NOT EXISTS entries_changed_ns ON entries(changed_ns);
+    CREATE INDEX IF NOT EXISTS deleted_deleted_ns ON deleted(deleted_ns);
+''')
+
+# Notified on every change to wake up clients waiting on the change stream
+_changed_cv = threading.Condition()
+
+# Change streams this process may still accept; clients turned away poll instead
+_stream_slots = threading.Semaphore(max(SERVER_THREADS - RESERVED_THREADS, 0))
+
+# In-memory copy of all entries and its encoded form, rebuilt only when entries change
+_lock = threading.RLock()
+_entries_cache = None
+_entries_bytes = None
+_etag = None
+# Gzip-compressed _entries_bytes, and the ETag it was compressed for
+_entries_gzip = None
+_gzip_etag = None
+# SQLite data_version the cache matches; it changes when other connections
+# (e.g. other worker processes) commit, so their changes are noticed too
+_cache_version = None
+
+def json_response(obj):
+    """Response with obj encoded as JSON"""
+    return Response(json_dumps(obj), mimetype='application/json')
+
+def notify_changed():
+    """Wake up clients waiting on the change stream"""
+    with _changed_cv:
+        _changed_cv.notify_all()
+
+def entry_row(date_str, entry):
+    """Database row for an entry"""
+    return (date_str, *(entry.get(field) for field in ENTRY_FIELDS))
+
+def row_entry(row):
+    """Entry for a database row"""
+    return {field: value for field, value in zip(ENTRY_FIELDS, row[1:]) if value is not None}
+
+def read_json_entries():
+    """Read entries stored as JSON files by earlier versions of the server"""
     entries = {}
     if os.path.exists(DATA_DIR):
-        for filename in os.listdir(DATA_DIR):
-            if filename.endswith('.json'):
-                date_str = filename[:-5]  # Remove .json extension
-                file_path = os.path.join(DATA_DIR, filename)
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        entries[date_str] = json.load(f)
-                except Exception as e:
-                    print(f"Error loading {file_path}: {e}")
-    return jsonify(entries)
+        with os.scandir(DATA_DIR) as it:
+            for de in it:
+                if de.name.endswith('.json'):
+                    date_str = de.name[:-5]  # Remove .json extension
+                    try:
+                        with open(de.path, 'rb') as f:
+                            entries[date_str] = json_loads(f.read())
+                    except Exception as e:
+                        print(f"Error loading {de.path}: {e}")
+    return entries
+
+def import_json_entries():
+    """Move JSON file entries into an empty database"""
+    if _db.execute('SELECT 1 FROM entries LIMIT 1').fetchone():
+        return
+    entries = read_json_entries()
+    if entries:
+        now_ns = time.time_ns()
+        with _db:
+            _db.executemany(
+                f'INSERT OR IGNORE INTO entries ({ENTRY_COLUMNS}, changed_ns) VALUES (?, ?, ?, ?, ?, ?)',
+                [(*entry_row(date_str, entry), now_ns) for date_str, entry in entries.items()]
+            )
+
+import_json_entries()
+
+def cached_entries():
+    """Get the encoded entries and their ETag, reloading them if stale"""
+    global _entries_cache, _entries_bytes, _etag, _cache_version
+    with _lock:
+        version = _db.execute('PRAGMA data_version').fetchone()[0]
+        if _entries_cache is None or version != _cache_version:
+            rows = _db.execute(f'SELECT {ENTRY_COLUMNS} FROM entries')
+            _entries_cache = {row[0]: row_entry(row) for row in rows}
+            _entries_bytes = None
+            _cache_version = version
+        if _entries_bytes is None:
+            _entries_bytes = json_dumps(_entries_cache)
+            _etag = hashlib.blake2b(_entries_bytes, digest_size=8).hexdigest()
+        return _entries_bytes, _etag
+
+def cached_entries_gzip():
+    """Get the gzip-compressed entries and their ETag, compressing once per change"""
+    global _entries_gzip, _gzip_etag
+    with _lock:
+        body, etag = cached_entries()
+        if etag != _gzip_etag:
+            _entries_gzip = gzip.compress(body)
+            _gzip_etag = etag
+        return _entries_gzip, etag
+
+def update_cache(date_str, row):
+    """Apply a change committed by this process to the cache (row is None for deletes)"""
+    global _entries_bytes
+    with _lock:
+        if _entries_cache is None:
+            return
+        if row is None:
+            _entries_cache.pop(date_str, None)
+        else:
+            _entries_cache[date_str] = row_entry(row)
+        _entries_bytes = None
+
+def latest_change_ns():
+    """Change timestamp of the latest change or delete (hold _lock)"""
+    return _db.execute('''SELECT MAX(
+        (SELECT IFNULL(MAX(changed_ns), 0) FROM entries),
+        (SELECT IFNULL(MAX(deleted_ns), 0) FROM deleted))''').fetchone()[0]
+
+def get_changes(since):
+    """Response with the entries changed and deleted after the change timestamp since"""
+    etag = cached_entries()[1]
+    with _lock:
+        # Read the latest timestamp first: changes committed meanwhile are sent
+        # again next time rather than skipped
+        max_ns = latest_change_ns()
+        rows = _db.execute(f'SELECT {ENTRY_COLUMNS} FROM entries WHERE changed_ns > ?', (since,))
+        entries = {row[0]: row_entry(row) for row in rows}
+        deleted = [row[0] for row in _db.execute('SELECT date_str FROM deleted WHERE deleted_ns > ?', (since,))]
+    
+    response = json_response({'max_ns': max_ns, 'entries': entries, 'deleted': deleted})
+    # Lets clients compare against the ETags announced on the change stream
+    response.set_etag(etag, weak=True)
+    return response
+
+@app.route('/entries', methods=['GET'])
+def get_entries():
+    """Get all journal entries, or with ?since= only the changes after that"""
+    since = request.args.get('since', type=int)
+    # Tombstones older than TOMBSTONE_TTL_NS are gone, so older clients get everything
+    if since and since > time.time_ns() - TOMBSTONE_TTL_NS:
+        return get_changes(since)
+    
+    with _lock:
+        # Read the latest timestamp first, as in get_changes
+        max_ns = latest_change_ns()
+        body, etag = cached_entries()
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    elif len(body) >= COMPRESS_MIN_SIZE and 'gzip' in request.accept_encodings:
+        # Serve the pre-compressed copy (flask-compress skips already encoded responses)
+        body, etag = cached_entries_gzip()
+        response = Response(body, mimetype='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = Response(body, mimetype='application/json')
+    # Weak, because flask-compress appends the encoding to strong ETags, and then
+    # they no longer match the change stream or the client's If-None-Match
+    response.set_etag(etag, weak=True)
+    response.vary.add('Accept-Encoding')
+    # Clients pass this as ?since= to fetch only the changes after these entries
+    response.headers['X-Max-Ns'] = str(max_ns)
+    return response
+
+@app.route('/entries/stream', methods=['GET'])
+def stream_entries():
+    """Push the current ETag to the client whenever entries change"""
+    if not _stream_slots.acquire(blocking=False):
+        return json_response({"error": "Too many change streams"}), 503
+    
+    def events():
+        seen = None
+        while True:
+            with _changed_cv:
+                if seen == cached_entries()[1]:
+                    _changed_cv.wait(timeout=STREAM_HEARTBEAT)
+            etag = cached_entries()[1]
+            if etag != seen:
+                seen = etag
+                yield f'data: W/"{etag}"\n\n'
+            else:
+                # Comment line keeps idle connections from timing out
+                yield ": keep-alive\n\n"
+    
+    response = Response(
+        flask.stream_with_context(events()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache'}
+    )
+    # Runs when the connection closes, even if the stream never started
+    response.call_on_close(_stream_slots.release)
+    return response
 
 @app.route('/entries/<date_str>', methods=['GET'])
 def get_entry(date_str):
     """Get a specific journal entry"""
-    file_path = os.path.join(DATA_DIR, f"{date_str}.json")
-    if os.path.exists(file_path):
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                entry = json.load(f)
-                return jsonify(entry)
-        except Exception as e:
-            return jsonify({"error": str(e)}), 500
-    return jsonify({"error": "Entry not found"}), 404
+    try:
+        with _lock:
+            row = _db.execute(f'SELECT {ENTRY_COLUMNS} FROM entries WHERE date_str = ?', (date_str,)).fetchone()
+            deleted = row is None and _db.execute('SELECT 1 FROM deleted WHERE date_str = ?', (date_str,)).fetchone()
+    except Exception as e:
+        return json_response({"error": str(e)}), 500
+    if row is not None:
+        return json_response(row_entry(row))
+    if deleted:
+        # Tells clients to drop their copy rather than send it again
+        return json_response({"error": "Entry deleted"}), 410
+    return json_response({"error": "Entry not found"}), 404
 
 @app.route('/entries/<date_str>', methods=['POST'])
 def save_entry(date_str):
     """Save a journal entry"""
-    content = request.json
-    file_path = os.path.join(DATA_DIR, f"{date_str}.json")
     try:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(content, f, ensure_ascii=False, indent=2)
-        return jsonify({"status": "success"})
+        content = json_loads(request.get_data())
+    except ValueError as e:
+        return json_response({"error": str(e)}), 400
+    if not isinstance(content, dict):
+        return json_response({"error": "Entry must be a JSON object"}), 400
+    try:
+        row = entry_row(date_str, content)
+        with _lock:
+            with _db:
+                _db.execute(
+                    f'INSERT OR REPLACE INTO entries ({ENTRY_COLUMNS}, changed_ns) '
+                    f'VALUES (?, ?, ?, ?, ?, {NEXT_CHANGE_NS})',
+                    (*row, time.time_ns())
+                )
+                _db.execute('DELETE FROM deleted WHERE date_str = ?', (date_str,))
+            update_cache(date_str, row)
+        notify_changed()
+        return json_response({"status": "success"})
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return json_response({"error": str(e)}), 500
 
 @app.route('/entries/<date_str>', methods=['DELETE'])
 def delete_entry(date_str):
     """Delete a journal entry"""
-    file_path = os.path.join(DATA_DIR, f"{date_str}.json")
-    if os.path.exists(file_path):
-        try:
-            os.remove(file_path)
-            return jsonify({"status": "success"})
-        except Exception as e:
-            return jsonify({"error": str(e)}), 500
-    return jsonify({"error": "Entry not found"}), 404
+    try:
+        with _lock:
+            with _db:
+                # Record the tombstone first, so its timestamp is after the entry's
+                now_ns = time.time_ns()
+                _db.execute(
+                    f'INSERT OR REPLACE INTO deleted (date_str, deleted_ns) VALUES (?, {NEXT_CHANGE_NS})',
+                    (date_str, now_ns)
+                )
+                _db.execute('DELETE FROM deleted WHERE deleted_ns < ?', (now_ns - TOMBSTONE_TTL_NS,))
+                deleted = _db.execute('DELETE FROM entries WHERE date_str = ?', (date_str,)).rowcount
+                if not deleted:
+                    _db.rollback()
+            update_cache(date_str, None)
+    except Exception as e:
+        return json_response({"error": str(e)}), 500
+    if deleted:
+        notify_changed()
+        return json_response({"status": "success"})
+    return json_response({"error": "Entry not found"}), 404
+
+def serve_worker():
+    """Run one server process on its own SO_REUSEPORT socket"""
+    from waitress import serve
+    # Every worker binds the same port; the kernel gives each socket its own accept
+    # queue and spreads new connections across them
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((HOST, PORT))
+    serve(app, sockets=[sock], threads=SERVER_THREADS)
 
 if __name__ == '__main__':
-    # Run the server on local network
-    app.run(host='0.0.0.0', port=5000, debug=True) 
\ No newline at end of file
+    if os.environ.get('NETHER_DEV'):
+        # Development server with reloader and debugger
+        app.run(host=HOST, port=PORT, debug=True)
+    elif SERVER_WORKERS > 1 and hasattr(socket, 'SO_REUSEPORT'):
+        # Spawn rather than fork, so each worker opens its own database connection
+        import multiprocessing
+        context = multiprocessing.get_context('spawn')
+        workers = [context.Process(target=serve_worker) for _ in range(SERVER_WORKERS)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+    else:
+        # Run the server on local network
+        from waitress import serve
+        serve(app, host=HOST, port=PORT, threads=SERVER_THREADS) 
\ No newline at end of file